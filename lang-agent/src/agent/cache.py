@@ -0,0 +1,49 @@
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+from cachetools import TTLCache
+from langchain_core.messages import BaseMessage
+
+# In-process caches; each worker process keeps its own copy.
+# LLM responses are exact-match and long-lived; read-only worker results expire quickly.
+LLM_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+WORKER_CACHE: TTLCache = TTLCache(maxsize=512, ttl=60)
+_CACHE_LOCK = threading.Lock()
+
+
+def _hash(obj: Any) -> str:
+    blob = json.dumps(obj, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def llm_cache_key(
+    model: str,
+    messages: Sequence[BaseMessage],
+    temperature: Optional[float],
+    **extra: Any,
+) -> str:
+    """Hash everything that influences a completion into a stable cache key."""
+    return _hash(
+        {
+            "model": model,
+            "messages": [[m.type, m.content] for m in messages],
+            "temperature": temperature,
+            "extra": extra,
+        }
+    )
+
+
+def worker_cache_key(path: str, payload: Dict[str, Any]) -> str:
+    return f"{path}:{_hash(payload)}"
+
+
+def cache_get(cache: TTLCache, key: str) -> Any:
+    with _CACHE_LOCK:
+        return cache.get(key)
+
+
+def cache_set(cache: TTLCache, key: str, value: Any) -> None:
+    with _CACHE_LOCK:
+        cache[key] = value
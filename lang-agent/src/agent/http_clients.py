@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any, Dict, List
+
+import httpx
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that keeps one connection pool per running event loop.
+
+    Pooled connections belong to the loop that opened them, so a module-level
+    AsyncClient on a plain transport breaks once that loop closes (e.g. repeated
+    asyncio.run calls in scripts or tests). Pools are created lazily per loop.
+
+    A pool can only be closed on its own loop: once the loop is gone its entry is
+    forgotten, but its sockets stay open until garbage collection. The FastAPI
+    lifespan closes the server's pools; any other caller that runs its own loop
+    must `await aclose_loop_transports()` before that loop exits.
+    """
+
+    def __init__(self, **transport_kwargs: Any) -> None:
+        self._transport_kwargs = transport_kwargs
+        self._transports: Dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+        _LOOP_LOCAL_TRANSPORTS.append(self)
+
+    def _current(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            # Forget pools of closed loops so they aren't reused; see the class docstring.
+            for stale in [other for other in self._transports if other.is_closed()]:
+                del self._transports[stale]
+            transport = self._transports[loop] = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._current().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the pool that belongs to the running loop."""
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+_LOOP_LOCAL_TRANSPORTS: List[LoopLocalTransport] = []
+
+
+async def aclose_loop_transports() -> None:
+    """
+    Close every pool opened on the running loop. Await this before the loop exits,
+    e.g. at the end of the coroutine passed to asyncio.run or on app shutdown.
+    """
+    for transport in _LOOP_LOCAL_TRANSPORTS:
+        await transport.aclose()
@@ -0,0 +1,65 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import httpx
+from langchain_core.messages import BaseMessage
+from langchain_openai import ChatOpenAI
+
+from src.agent.cache import LLM_CACHE, cache_get, cache_set, llm_cache_key
+from src.agent.http_clients import LoopLocalTransport
+from src.config import OPENAI_API_KEY
+
+# One keep-alive pool shared by every cached client so OpenAI calls reuse connections.
+# HTTP/2 multiplexes concurrent requests over a few connections instead of
+# queueing them behind the per-host HTTP/1.1 pool.
+_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+_HTTP_CLIENT = httpx.Client(transport=httpx.HTTPTransport(http2=True, retries=2, limits=_LIMITS))
+# The async pool is kept per event loop (see LoopLocalTransport).
+_ASYNC_HTTP_CLIENT = httpx.AsyncClient(transport=LoopLocalTransport(http2=True, retries=2, limits=_LIMITS))
+
+
+@lru_cache(maxsize=16)
+def get_llm(model: str, temperature: Optional[float] = None, json_mode: bool = False) -> ChatOpenAI:
+    """
+    Return a shared ChatOpenAI client for the given model/temperature pair.
+    json_mode asks the API for a strict JSON object response.
+    """
+    return ChatOpenAI(
+        model=model,
+        api_key=OPENAI_API_KEY,
+        temperature=temperature,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_ASYNC_HTTP_CLIENT,
+        model_kwargs={"response_format": {"type": "json_object"}} if json_mode else {},
+    )
+
+
+def _response_cache_key(
+    model: str, messages: List[BaseMessage], temperature: Optional[float], json_mode: bool, kwargs: Dict[str, Any]
+) -> Optional[str]:
+    if temperature != 0:
+        return None
+    return llm_cache_key(model, messages, temperature, json_mode=json_mode, **kwargs)
+
+
+async def ainvoke_llm(
+    model: str,
+    messages: List[BaseMessage],
+    temperature: Optional[float] = None,
+    json_mode: bool = False,
+    **kwargs: Any,
+) -> Any:
+    """
+    Invoke the cached client for model/temperature, short-circuiting repeat prompts.
+    Only deterministic calls (temperature 0) are stored in the response cache; None
+    falls back to the API's default sampling temperature and is not cached.
+    """
+    key = _response_cache_key(model, messages, temperature, json_mode, kwargs)
+    if key is not None:
+        cached = cache_get(LLM_CACHE, key)
+        if cached is not None:
+            return cached
+    response = await get_llm(model, temperature, json_mode).ainvoke(messages, **kwargs)
+    if key is not None:
+        cache_set(LLM_CACHE, key, response)
+    return response
@@ -2,11 +2,15 @@ import json
 import re
 from typing import Any, Dict, List, Optional
 
-import requests
-from langchain_openai import ChatOpenAI
+import httpx
+import orjson
 from langchain_core.messages import HumanMessage, SystemMessage
+from openai import BadRequestError
 
-from src.config import MCP_BASE_URL, MCP_GATEWAY_TOKEN, OPENAI_API_KEY
+from src.agent.cache import WORKER_CACHE, cache_get, cache_set, worker_cache_key
+from src.agent.http_clients import LoopLocalTransport
+from src.agent.llm import ainvoke_llm
+from src.config import MCP_BASE_URL, MCP_GATEWAY_TOKEN
 
 # Types for structured return values
 ArticleSummary = Dict[str, Any]
@@ -83,171 +87,289 @@ MUTATING_KEYWORDS = re.compile(
     r"\b(insert|update|delete|drop|alter|create|grant|revoke|truncate|attach|detach|pragma|vacuum)\b",
     re.IGNORECASE,
 )
+LIMIT_PATTERN = re.compile(r"\blimit\b", re.IGNORECASE)
+AGGREGATE_COLUMN_PATTERN = re.compile(r"^\s*(count|sum|avg|total|min|max)\b", re.IGNORECASE)
+
+# Shared async HTTP client so worker round-trips reuse pooled keep-alive (HTTP/2)
+# connections instead of paying a TCP+TLS handshake on every call. The pool is
+# kept per event loop so the client survives across asyncio.run calls; see
+# aclose_loop_transports for closing it outside the FastAPI app.
+_WORKER_CLIENT = httpx.AsyncClient(
+    transport=LoopLocalTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    ),
+    timeout=30,
+)
+
+_WORKER_HEADERS: Dict[str, str] = {"Content-Type": "application/json"}
+if MCP_GATEWAY_TOKEN:
+    _WORKER_HEADERS["Authorization"] = f"Bearer {MCP_GATEWAY_TOKEN}"
+
+# Read-only worker endpoints whose successful responses may be served from WORKER_CACHE.
+_CACHEABLE_WORKER_PATHS = frozenset({"/proxy/db/query", "/proxy/news_articles"})
 
 PLANNER_SCHEMA_JSON = """{
   "type": "object",
   "properties": {
     "sql": { "type": "string", "description": "A single read-only SELECT for SQLite. Use named parameters like :p1" },
     "params": { "type": "object", "additionalProperties": true },
-    "explain": { "type": "string" }
+    "explain": { "type": "string" },
+    "summary_template": { "type": "string", "description": "Answer to the question written before seeing the rows, used only for list-style results. Use {row_count} for the number of result rows (never the answer to a count question) and {rows} where the row list belongs." }
   },
   "required": ["sql"]
 }"""
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _dumps_indented(obj: Any) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
+# The schema and planner rules never change, so render them once at import time.
+_SCHEMA_JSON = _dumps_indented({"tables": DEFAULT_CRIME_DB_SCHEMA})
+
+_PLANNER_SYSTEM = "\n".join(
+    [
+        "You translate natural-language questions into SAFE SQLite SELECT queries for Cloudflare D1.",
+        "Rules:",
+        " - Return STRICT JSON matching the schema below, nothing else.",
+        " - Read-only: SELECT only. No PRAGMA/ATTACH/CREATE/INSERT/UPDATE/DELETE.",
+        " - Always include a LIMIT (<= 1000). Never add OFFSET: the caller pages through the result itself.",
+        " - Prefer named parameters (:p1, :p2) instead of string concatenation.",
+        " - Dates: use SQLite date/julianday with 'now' (e.g., julianday('now','-30 day')).",
+        " - To connect articles with incidents, join incident_article_link (incident_id -> incidents.id, article_id -> article.article_id).",
+        " - Include summary_template: a concise, factual answer using the {row_count} and {rows} placeholders; never invent values.",
+        " - {row_count} is the number of result rows, never the answer to a count/total question; aggregate results are summarized separately.",
+    ]
+)
+
+# Only the question and schema vary. PLANNER_SCHEMA_JSON's braces are escaped so
+# str.format leaves them (and its {rows}/{row_count} hints) intact.
+_PLANNER_USER_TMPL = (
+    "User question:\n{q}\n\nSQLite schema (JSON):\n{schema}\n\nReturn JSON per this JSON Schema:\n"
+    + PLANNER_SCHEMA_JSON.replace("{", "{{").replace("}", "}}")
+)
 
-def _sanitize_select(sql: str) -> str:
-    """Enforce read-only SELECT queries with a LIMIT."""
+
+def _sanitize_select(sql: str, limit: int = 1000, offset: int = 0) -> str:
+    """
+    Enforce read-only SELECT queries capped at `limit` rows, starting at `offset`.
+    A query with its own LIMIT is wrapped in a subquery so the cap and offset still apply.
+    """
     s = sql.strip().rstrip(";")
     if not SQL_SELECT_PATTERN.match(s):
         raise ValueError("Only SELECT queries are allowed.")
     if MUTATING_KEYWORDS.search(s):
         raise ValueError("Mutating SQL is not allowed.")
-    if not re.search(r"\blimit\s+\d+\b", s, flags=re.IGNORECASE):
-        s = f"{s}\nLIMIT 1000"
+    if LIMIT_PATTERN.search(s):
+        # Newline before the paren so a trailing "-- comment" can't swallow it.
+        s = f"SELECT * FROM (\n{s}\n)"
+    s = f"{s}\nLIMIT {limit}"
+    if offset:
+        s = f"{s} OFFSET {offset}"
     return s
 
 
-def _plan_sql_from_query(user_query: str, schema_json: str, model: str = "gpt-4o-mini") -> Dict[str, Any]:
-    system = "\n".join(
-        [
-            "You translate natural-language questions into SAFE SQLite SELECT queries for Cloudflare D1.",
-            "Rules:",
-            " - Return STRICT JSON matching the schema below, nothing else.",
-            " - Read-only: SELECT only. No PRAGMA/ATTACH/CREATE/INSERT/UPDATE/DELETE.",
-            " - Always include a LIMIT (<= 1000).",
-            " - Prefer named parameters (:p1, :p2) instead of string concatenation.",
-            " - Dates: use SQLite date/julianday with 'now' (e.g., julianday('now','-30 day')).",
-            " - To connect articles with incidents, join incident_article_link (incident_id -> incidents.id, article_id -> article.article_id).",
-        ]
-    )
-
-    user = "\n".join(
-        [
-            "User question:",
-            user_query,
-            "",
-            "SQLite schema (JSON):",
-            schema_json,
-            "",
-            "Return JSON per this JSON Schema:",
-            PLANNER_SCHEMA_JSON,
-        ]
-    )
-
-    llm = ChatOpenAI(model=model, api_key=OPENAI_API_KEY, temperature=0.2)
-    raw = llm.invoke([SystemMessage(content=system), HumanMessage(content=user)])
+def _planner_messages(user_query: str, schema_json: str) -> List[Any]:
+    user = _PLANNER_USER_TMPL.format(q=user_query, schema=schema_json)
+    return [SystemMessage(content=_PLANNER_SYSTEM), HumanMessage(content=user)]
+
+
+def _parse_plan(raw: Any) -> Dict[str, Any]:
     if not hasattr(raw, "content") or not isinstance(raw.content, str):
         raise ValueError("Planner did not return text content.")
 
     text = raw.content
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    # Without JSON mode (see _plan_sql_from_query) the object may be wrapped in prose;
+    # decode from the first brace.
     start = text.find("{")
-    end = text.rfind("}")
-    if start == -1 or end == -1:
+    if start == -1:
         raise ValueError("Planner did not return JSON.")
-    json_str = text[start : end + 1]
-    return json.loads(json_str)
+    plan, _ = _JSON_DECODER.raw_decode(text, start)
+    return plan
 
 
-def _call_worker(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    headers = {"Content-Type": "application/json"}
-    if MCP_GATEWAY_TOKEN:
-        headers["Authorization"] = f"Bearer {MCP_GATEWAY_TOKEN}"
+async def _plan_sql_from_query(user_query: str, schema_json: str, model: str = "gpt-4o-mini") -> Dict[str, Any]:
+    # SQL planning should be deterministic; temperature 0 also lets repeat questions hit the response cache.
+    messages = _planner_messages(user_query, schema_json)
+    try:
+        raw = await ainvoke_llm(model, messages, temperature=0, json_mode=True)
+    except BadRequestError as exc:
+        # Models without JSON-mode support reject response_format; ask again without it.
+        if "response_format" not in str(exc):
+            raise
+        raw = await ainvoke_llm(model, messages, temperature=0)
+    return _parse_plan(raw)
+
+
+async def _call_worker(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    key = worker_cache_key(path, payload) if path in _CACHEABLE_WORKER_PATHS else None
+    if key is not None:
+        cached = cache_get(WORKER_CACHE, key)
+        if cached is not None:
+            return cached
     url = f"{MCP_BASE_URL}{path}"
-    response = requests.post(url, json=payload, headers=headers, timeout=30)
-    if not response.ok:
+    response = await _WORKER_CLIENT.post(url, json=payload, headers=_WORKER_HEADERS)
+    if not response.is_success:
         raise RuntimeError(f"Worker call failed ({response.status_code}): {response.text}")
-    return response.json()
+    data = response.json()
+    if key is not None:
+        cache_set(WORKER_CACHE, key, data)
+    return data
 
 
-def _run_db_query(sql: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    return _call_worker("/proxy/db/query", {"sql": sql, "params": params or {}})
+async def _run_db_query(sql: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return await _call_worker("/proxy/db/query", {"sql": sql, "params": params or {}})
 
 
-def _fetch_news_articles(payload: Dict[str, Any]) -> Dict[str, Any]:
-    return _call_worker("/proxy/news_articles", payload)
+async def _fetch_news_articles(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await _call_worker("/proxy/news_articles", payload)
 
 
-def openai_chat_service(
+async def openai_chat_service(
     prompt: str,
     model: str = "gpt-4o-mini",
     system: Optional[str] = None,
     temperature: Optional[float] = None,
     max_tokens: Optional[int] = None,
 ) -> Dict[str, Any]:
-    llm = ChatOpenAI(model=model, api_key=OPENAI_API_KEY, temperature=temperature)
     messages: List[Any] = []
     if system:
         messages.append(SystemMessage(content=system))
     messages.append(HumanMessage(content=prompt))
-    result = llm.invoke(messages, max_tokens=max_tokens)
+    result = await ainvoke_llm(model, messages, temperature=temperature, max_tokens=max_tokens)
     text = result.content if isinstance(result.content, str) else str(result.content)
     return {"content": [{"type": "text", "text": text}]}
 
 
-def crime_insights_service(
+def _summary_messages(
+    q: str,
+    sql: str,
+    plan: Dict[str, Any],
+    row_count: str,
+    preview: List[Dict[str, Any]],
+) -> List[Any]:
+    summary_prompt_parts = [
+        f"Question: {q}",
+        f"SQL:\n{sql}",
+        f"Returned rows: {row_count} (showing first {len(preview)})",
+        _dumps_indented(preview),
+        "Write a concise, factual answer. Include concrete counts and time ranges if present.",
+    ]
+    if plan.get("explain"):
+        summary_prompt_parts.insert(1, f"Planner notes: {plan['explain']}")
+    return [
+        SystemMessage(content="You are a precise crime analyst."),
+        HumanMessage(content="\n\n".join(summary_prompt_parts)),
+    ]
+
+
+def _looks_aggregate(columns: List[str], rows: List[Dict[str, Any]]) -> bool:
+    # A single row (e.g. SELECT COUNT(*) AS n) or only COUNT/SUM/AVG-style columns means the
+    # answer is in the values, which a template written before the query can't know.
+    return len(rows) == 1 or (bool(columns) and all(AGGREGATE_COLUMN_PATTERN.match(c) for c in columns))
+
+
+def _format_rows(rows: List[Dict[str, Any]]) -> str:
+    lines = [", ".join(f"{k}: {v}" for k, v in row.items()) for row in rows]
+    if len(lines) == 1:
+        return lines[0]
+    return "\n".join(f"- {line}" for line in lines)
+
+
+def _summary_from_template(
+    plan: Dict[str, Any],
+    row_count: str,
+    preview: List[Dict[str, Any]],
+    columns: List[str],
+    truncated: bool,
+) -> Optional[str]:
+    """
+    Fill the planner's summary_template for plain list results, or return None so the
+    caller asks the model: when the template has no usable placeholders, the result
+    looks aggregate, or it was capped (the row count is then only a lower bound).
+    """
+    template = plan.get("summary_template")
+    if not isinstance(template, str) or ("{rows}" not in template and "{row_count}" not in template):
+        return None
+    if truncated or _looks_aggregate(columns, preview):
+        return None
+    row_lines = _format_rows(preview)
+    # str.replace rather than str.format: model output may contain other braces.
+    return template.replace("{row_count}", row_count).replace("{rows}", row_lines or "(no rows)")
+
+
+def _insights_result(
+    text: str,
+    sql: str,
+    rows: List[Dict[str, Any]],
+    truncated: bool,
+    columns: List[str],
+    model: str,
+) -> Dict[str, Any]:
+    # rowCount is the number of rows returned; truncated marks that more rows matched past the cap.
+    return {
+        "content": [{"type": "text", "text": text}],
+        "metadata": {"sql": sql, "rowCount": len(rows), "truncated": truncated, "columns": columns, "model": model},
+    }
+
+
+async def crime_insights_service(
     q: str,
     model: str = "gpt-4o-mini",
     summarize: bool = True,
     preview_limit: int = 20,
+    offset: int = 0,
 ) -> Dict[str, Any]:
     if preview_limit < 1 or preview_limit > 50:
         return {"content": [{"type": "text", "text": "preview_limit must be between 1 and 50."}], "isError": True}
-
-    schema_json = json.dumps({"tables": DEFAULT_CRIME_DB_SCHEMA}, indent=2)
+    if offset < 0:
+        return {"content": [{"type": "text", "text": "offset must be >= 0."}], "isError": True}
 
     try:
-        plan = _plan_sql_from_query(q, schema_json, model=model)
+        plan = await _plan_sql_from_query(q, _SCHEMA_JSON, model=model)
     except Exception as exc:
         return {"content": [{"type": "text", "text": f"Planning failed: {exc}"}], "isError": True}
 
+    # Only the preview is used when summarizing, so don't pull rows past it. One
+    # extra row is fetched to tell whether the result was cut off.
+    row_cap = preview_limit if summarize else 1000
     try:
-        sql = _sanitize_select(plan.get("sql", ""))
+        sql = _sanitize_select(plan.get("sql", ""), limit=row_cap + 1, offset=offset)
     except Exception as exc:
         return {"content": [{"type": "text", "text": f"SQL rejected: {exc}"}], "isError": True}
 
     try:
-        query_res = _run_db_query(sql, plan.get("params"))
+        query_res = await _run_db_query(sql, plan.get("params"))
     except Exception as exc:
         return {"content": [{"type": "text", "text": f"Query failed: {exc}\n\nSQL:\n{sql}"}], "isError": True}
 
     rows: List[Dict[str, Any]] = query_res.get("rows", [])
     columns: List[str] = query_res.get("columns", [])
+    truncated = len(rows) > row_cap
+    rows = rows[:row_cap]
+    row_count = f"more than {row_cap}" if truncated else str(len(rows))
     preview = rows[:preview_limit]
 
     if not summarize:
-        return {
-            "content": [
-                {"type": "text", "text": f"Rows: {len(rows)}\n\nSQL:\n{sql}\n\nPreview:\n{json.dumps(preview, indent=2)}"}
-            ],
-            "metadata": {"sql": sql, "rowCount": len(rows), "columns": columns, "model": model},
-        }
+        text = f"Rows: {row_count}\n\nSQL:\n{sql}\n\nPreview:\n{_dumps_indented(preview)}"
+        return _insights_result(text, sql, rows, truncated, columns, model)
 
-    summary_prompt_parts = [
-        f"Question: {q}",
-        f"SQL:\n{sql}",
-        f"Returned rows: {len(rows)} (showing first {len(preview)})",
-        json.dumps(preview, indent=2),
-        "Write a concise, factual answer. Include concrete counts and time ranges if present.",
-    ]
-    if plan.get("explain"):
-        summary_prompt_parts.insert(1, f"Planner notes: {plan['explain']}")
+    summary_text = _summary_from_template(plan, row_count, preview, columns, truncated)
+    if summary_text is None:
+        summary_msg = await ainvoke_llm(model, _summary_messages(q, sql, plan, row_count, preview), temperature=0.2)
+        summary_text = summary_msg.content if isinstance(summary_msg.content, str) else str(summary_msg.content)
+    return _insights_result(summary_text, sql, rows, truncated, columns, model)
 
-    llm = ChatOpenAI(model=model, api_key=OPENAI_API_KEY, temperature=0.2)
-    summary_msg = llm.invoke(
-        [
-            SystemMessage(content="You are a precise crime analyst."),
-            HumanMessage(content="\n\n".join(summary_prompt_parts)),
-        ]
-    )
-    summary_text = summary_msg.content if isinstance(summary_msg.content, str) else str(summary_msg.content)
 
-    return {
-        "content": [{"type": "text", "text": summary_text}],
-        "metadata": {"sql": sql, "rowCount": len(rows), "columns": columns, "model": model},
-    }
-
-
-def news_articles_service(
+async def news_articles_service(
     limit: int = 10,
     since: Optional[str] = None,
     query: Optional[str] = None,
@@ -265,7 +387,7 @@ def news_articles_service(
         payload["cityId"] = cityId
 
     try:
-        data = _fetch_news_articles(payload)
+        data = await _fetch_news_articles(payload)
     except Exception as exc:
         return {"content": [{"type": "text", "text": f"Failed to fetch articles: {exc}"}], "isError": True}
 
@@ -287,27 +409,16 @@ def news_articles_service(
     }
 
 
-def recent_day_summary_service(limit: int = 25) -> Dict[str, Any]:
+async def recent_day_summary_service(limit: int = 25) -> Dict[str, Any]:
     """
     Return a summary of incidents from the most recent reported day, including any linked article.
     """
     try:
         safe_limit = max(1, min(int(limit), 200))
-         
-        latest_res = _run_db_query(
-            """
-            SELECT MAX(reported_date) AS latest_date
-            FROM incidents
-            WHERE reported_date IS NOT NULL
-            """
-        )
-        latest_date = None
-        if latest_res.get("rows"):
-            latest_date = latest_res["rows"][0].get("latest_date")
-        if not latest_date:
-            return {"content": [{"type": "text", "text": "No incidents found."}], "metadata": {"count": 0}}
 
-        incidents_res = _run_db_query(
+        # The CTE resolves the latest reported day in the same round-trip, so the
+        # date for the response is taken from the returned rows.
+        incidents_res = await _run_db_query(
             f"""
             WITH latest AS (
                 SELECT MAX(reported_date) AS d
@@ -334,21 +445,19 @@ def recent_day_summary_service(limit: int = 25) -> Dict[str, Any]:
         )
 
         rows: List[IncidentSummary] = incidents_res.get("rows", [])
-        if not rows:
-            return {
-                "content": [{"type": "text", "text": f"No incidents found on {latest_date}."}],
-                "metadata": {"count": 0, "latestDate": latest_date},
-            }
+        latest_date = rows[0].get("reported_date") if rows else None
+        if not latest_date:
+            return {"content": [{"type": "text", "text": "No incidents found."}], "metadata": {"count": 0}}
 
         lines: List[str] = []
         for row in rows:
-            article_hint = ""
-            if row.get("article_url"):
-                article_hint = f" | article: {row.get('article_url')}"
-            lines.append(
-                f"- {row.get('reported_date') or latest_date} | {row.get('neighbourhood') or 'Unknown area'} | "
-                f"{row.get('crime_type') or 'Unknown crime'}{article_hint}"
-            )
+            get = row.get
+            reported = get("reported_date") or latest_date
+            area = get("neighbourhood") or "Unknown area"
+            crime = get("crime_type") or "Unknown crime"
+            url = get("article_url")
+            article_hint = f" | article: {url}" if url else ""
+            lines.append(f"- {reported} | {area} | {crime}{article_hint}")
 
         return {
             "content": [
@@ -363,16 +472,20 @@ def recent_day_summary_service(limit: int = 25) -> Dict[str, Any]:
         return {"content": [{"type": "text", "text": f"Failed to build summary: {exc}"}], "isError": True}
 
 
+_TOOLS: List[Dict[str, str]] = [
+    {"name": "crime_insights", "description": "Ask natural questions about the crime dataset."},
+    {"name": "news_articles", "description": "Fetch recent crime-related news articles from CRIME_DB."},
+    {"name": "recent_day_summary", "description": "Summarize incidents from the most recent reported day with article links if available."},
+    {"name": "openai_chat", "description": "General-purpose chat completion via the agent."},
+    {"name": "list_tools", "description": "List tools currently available to the agent."},
+]
+_TOOLS_SUMMARY = "\n".join(f"- {tool['name']} • {tool['description']}" for tool in _TOOLS)
+# Static, so built once; callers must treat it as read-only.
+_LIST_TOOLS_RESPONSE: Dict[str, Any] = {
+    "content": [{"type": "text", "text": f"Available tools ({len(_TOOLS)}):\n{_TOOLS_SUMMARY}"}],
+    "metadata": {"count": len(_TOOLS), "tools": _TOOLS},
+}
+
+
 def list_tools_service() -> Dict[str, Any]:
-    tools = [
-        {"name": "crime_insights", "description": "Ask natural questions about the crime dataset."},
-        {"name": "news_articles", "description": "Fetch recent crime-related news articles from CRIME_DB."},
-        {"name": "recent_day_summary", "description": "Summarize incidents from the most recent reported day with article links if available."},
-        {"name": "openai_chat", "description": "General-purpose chat completion via the agent."},
-        {"name": "list_tools", "description": "List tools currently available to the agent."},
-    ]
-    summary = "\n".join(f"- {tool['name']} • {tool['description']}" for tool in tools)
-    return {
-        "content": [{"type": "text", "text": f"Available tools ({len(tools)}):\n{summary}"}],
-        "metadata": {"count": len(tools), "tools": tools},
-    }
+    return _LIST_TOOLS_RESPONSE
@@ -5,24 +5,27 @@ from langchain.tools import tool
 from src.agent import services
 
 
-def _omit_none(payload: dict[str, Any]) -> dict[str, Any]:
-    """Return a copy without None values so optional fields pass validation."""
-    return {k: v for k, v in payload.items() if v is not None}
+def _omit_none(**kwargs: Any) -> dict[str, Any]:
+    """Return the keyword arguments without None values so optional fields pass validation."""
+    return {k: v for k, v in kwargs.items() if v is not None}
 
 
 @tool
-def crime_insights(
+async def crime_insights(
     q: str,
     model: str = "gpt-4o-mini",
     summarize: bool = True,
     preview_limit: int = 20,
+    offset: int = 0,
 ) -> Any:
     """Ask natural questions about the crime dataset."""
-    return services.crime_insights_service(q=q, model=model, summarize=summarize, preview_limit=preview_limit)
+    return await services.crime_insights_service(
+        q=q, model=model, summarize=summarize, preview_limit=preview_limit, offset=offset
+    )
 
 
 @tool
-def news_articles(
+async def news_articles(
     limit: int = 10,
     since: Optional[str] = None,
     query: Optional[str] = None,
@@ -30,16 +33,8 @@ def news_articles(
     cityId: Optional[int] = None,
 ) -> Any:
     """Fetch recent crime-related news articles from CRIME_DB, article table."""
-    payload = _omit_none(
-        {
-            "limit": limit,
-            "since": since,
-            "query": query,
-            "sourceIds": sourceIds,
-            "cityId": cityId,
-        }
-    )
-    return services.news_articles_service(**payload)
+    payload = _omit_none(limit=limit, since=since, query=query, sourceIds=sourceIds, cityId=cityId)
+    return await services.news_articles_service(**payload)
 
 @tool
 def list_tools() -> Any:
@@ -48,7 +43,7 @@ def list_tools() -> Any:
 
 
 @tool
-def openai_chat(
+async def openai_chat(
     prompt: str,
     model: str = "gpt-4o-mini",
     system: Optional[str] = None,
@@ -57,18 +52,16 @@ def openai_chat(
 ) -> Any:
     """General-purpose chat completion via the agent."""
     payload = _omit_none(
-        {
-            "model": model,
-            "prompt": prompt,
-            "system": system,
-            "temperature": temperature,
-            "max_tokens": maxTokens,
-        }
+        model=model,
+        prompt=prompt,
+        system=system,
+        temperature=temperature,
+        max_tokens=maxTokens,
     )
-    return services.openai_chat_service(**payload)
+    return await services.openai_chat_service(**payload)
 
 
 @tool
-def recent_day_summary(limit: int = 25) -> Any:
+async def recent_day_summary(limit: int = 25) -> Any:
     """Summarize incidents from the most recent reported day with article links when available."""
-    return services.recent_day_summary_service(limit=limit)
+    return await services.recent_day_summary_service(limit=limit)
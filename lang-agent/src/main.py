@@ -1,8 +1,11 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from pydantic import BaseModel
 from langchain_core.messages import HumanMessage
 from src.agent.graph import app as graph_app
 from src.agent import services
+from src.agent.http_clients import aclose_loop_transports
 
 class Query(BaseModel):
     query: str
@@ -19,6 +22,7 @@ class CrimeInsightsPayload(BaseModel):
     model: str = "gpt-4o-mini"
     summarize: bool = True
     preview_limit: int = 20
+    offset: int = 0
 
 class NewsArticlesPayload(BaseModel):
     limit: int = 10
@@ -27,18 +31,24 @@ class NewsArticlesPayload(BaseModel):
     sourceIds: list[int] | None = None
     cityId: int | None = None
 
-api = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the pooled worker/OpenAI connections opened on the server's loop.
+    await aclose_loop_transports()
+
+api = FastAPI(lifespan=lifespan)
 
 @api.post("/agent/query")
 async def query_agent(payload: Query):
     initial_state = {"messages": [HumanMessage(content=payload.query)]}
-    result = graph_app.invoke(initial_state)
+    result = await graph_app.ainvoke(initial_state)
     final_msg = result["messages"][-1]
     return {"answer": final_msg.content}
 
 @api.post("/tools/openai_chat")
 async def tool_openai_chat(payload: OpenAIChatPayload):
-    return services.openai_chat_service(
+    return await services.openai_chat_service(
         prompt=payload.prompt,
         model=payload.model,
         system=payload.system,
@@ -48,16 +58,17 @@ async def tool_openai_chat(payload: OpenAIChatPayload):
 
 @api.post("/tools/crime_insights")
 async def tool_crime_insights(payload: CrimeInsightsPayload):
-    return services.crime_insights_service(
+    return await services.crime_insights_service(
         q=payload.q,
         model=payload.model,
         summarize=payload.summarize,
         preview_limit=payload.preview_limit,
+        offset=payload.offset,
     )
 
 @api.post("/tools/news_articles")
 async def tool_news_articles(payload: NewsArticlesPayload):
-    return services.news_articles_service(
+    return await services.news_articles_service(
         limit=payload.limit,
         since=payload.since,
         query=payload.query,
@@ -79,4 +90,4 @@ async def tool_recent_day_summary(payload: dict | None = None):
                 limit = int(maybe_limit)
         except Exception:
             pass
-    return services.recent_day_summary_service(limit=limit)
+    return await services.recent_day_summary_service(limit=limit)
@@ -1,26 +1,134 @@
 import asyncio
-from typing import Any, Dict
+import concurrent.futures
+import threading
+from typing import Any, Dict, Optional
 
+import anyio
+import httpx
 from mcp.client.sse import sse_client
 from mcp.client.session import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
 
 from src.config import MCP_BASE_URL
 
+CALL_TIMEOUT_SECONDS = 30
 
-async def _call_tool(tool_name: str, payload: Dict[str, Any]) -> Any:
+# Failures that mean the SSE stream itself is unusable, as opposed to a single bad tool call.
+_TRANSPORT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, httpx.TransportError, OSError)
+
+
+def _is_transport_error(exc: Exception) -> bool:
+    if isinstance(exc, McpError):
+        return exc.error.code == CONNECTION_CLOSED
+    return isinstance(exc, _TRANSPORT_ERRORS)
+
+
+class _McpClient:
     """
-    Call an MCP tool using the MCP SSE transport exposed by the Worker (/sse).
-    Returns the raw MCP tool response (content/metadata structure).
+    Long-lived MCP client for the Worker's SSE transport (/sse).
+
+    The event loop runs on a daemon thread and keeps one SSE stream and one
+    initialized ClientSession open, so tool calls skip the connect/initialize
+    handshake. If the stream drops, the next call reconnects; errors from an
+    individual tool call leave the shared session in place.
     """
-    url = f"{MCP_BASE_URL}/sse"
-    async with sse_client(url) as (read_stream, write_stream):
-        async with ClientSession(read_stream, write_stream) as session:
-            await session.initialize()
+
+    def __init__(self, url: str) -> None:
+        self._url = url
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-client", daemon=True)
+        self._thread.start()
+        self._lock = asyncio.Lock()
+        self._session: Optional[ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _serve(self, ready: asyncio.Future) -> None:
+        # The SSE/session context managers must be entered and exited in the same
+        # task, so this task owns them and simply parks until it is cancelled.
+        try:
+            async with sse_client(self._url) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    ready.set_result(session)
+                    await asyncio.Event().wait()
+        except Exception as exc:
+            if not ready.done():
+                ready.set_exception(exc)
+        finally:
+            if self._task is asyncio.current_task():
+                self._session = None
+                self._task = None
+
+    async def _ensure_session(self) -> ClientSession:
+        async with self._lock:
+            if self._session is None:
+                ready = self._loop.create_future()
+                self._task = self._loop.create_task(self._serve(ready))
+                self._session = await ready
+            return self._session
+
+    async def _reset(self, session: ClientSession) -> None:
+        # Only tear down the session that failed; another caller may already have
+        # replaced it with a fresh one.
+        async with self._lock:
+            if self._session is not session:
+                return
+            self._session = None
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    async def _call(self, tool_name: str, payload: Dict[str, Any]) -> Any:
+        session = await self._ensure_session()
+        try:
             return await session.call_tool(tool_name, arguments=payload)
+        except Exception as exc:
+            # Drop the session so the next call starts from a fresh connection.
+            if _is_transport_error(exc):
+                await self._reset(session)
+            raise
+
+    def call(self, tool_name: str, payload: Dict[str, Any]) -> Any:
+        future = asyncio.run_coroutine_threadsafe(self._call(tool_name, payload), self._loop)
+        try:
+            return future.result(timeout=CALL_TIMEOUT_SECONDS)
+        except concurrent.futures.TimeoutError:
+            # A slow tool is not a broken stream: cancel this call and keep the session.
+            future.cancel()
+            raise
+
+    async def acall(self, tool_name: str, payload: Dict[str, Any]) -> Any:
+        """Await a tool call from any event loop (e.g. a FastAPI request) without blocking it."""
+        future = asyncio.run_coroutine_threadsafe(self._call(tool_name, payload), self._loop)
+        # On timeout wait_for cancels the wrapped future, which cancels the call on the client loop.
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=CALL_TIMEOUT_SECONDS)
+
+
+_client: Optional[_McpClient] = None
+_client_lock = threading.Lock()
+
+
+def _mcp_client() -> _McpClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _McpClient(f"{MCP_BASE_URL}/sse")
+    return _client
 
 
 def call_mcp_tool(tool_name: str, payload: Dict[str, Any]) -> Any:
     """
     Synchronous wrapper used by the agent tooling to call MCP tools.
+    Returns the raw MCP tool response (content/metadata structure).
+    """
+    return _mcp_client().call(tool_name, payload)
+
+
+async def acall_mcp_tool(tool_name: str, payload: Dict[str, Any]) -> Any:
+    """
+    Async counterpart of call_mcp_tool for callers already running an event loop,
+    where the synchronous wrapper would block the loop.
     """
-    return asyncio.run(_call_tool(tool_name, payload))
+    return await _mcp_client().acall(tool_name, payload)